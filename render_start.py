@@ -4,11 +4,49 @@ VeriVigil Banking Fraud Detection API - Render Production Starter
 Ultra-minimal deployment for Render.com free tier
 """
 
+import json
 import os
+import re
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
+# Risk rules, resolved once at import
+# Amount limits are floats to match the float-converted request amount
+_AMOUNT_RISK_STEPS = ((10_000.0, 0.3), (50_000.0, 0.2), (100_000.0, 0.2))
+_RISK_LADDER = ((0.7, "HIGH"), (0.4, "MEDIUM"))
+_FRAUD_THRESHOLD = _RISK_LADDER[0][0]
+# Keywords are matched as substrings, so a single compiled alternation
+# replaces the per-call list scans
+_HIGH_RISK_LOCATIONS = re.compile("dubai|nigeria|russia")
+_HIGH_RISK_CATEGORIES = re.compile("casino|gambling|crypto")
+
+
+def _risk_level(score: float) -> str:
+    """Map a risk score to its risk level."""
+    for threshold, name in _RISK_LADDER:
+        if score > threshold:
+            return name
+    return "LOW"
+
+
+# Explicit CORS origins (comma separated); empty disables CORS
+_CORS_ORIGINS = tuple(
+    origin.strip()
+    for origin in os.environ.get("CORS_ORIGINS", "https://zey1r.github.io").split(",")
+    if origin.strip()
+)
+
+# Static responses, serialised once
+def _json_body(content: dict) -> bytes:
+    """Encode content the way FastAPI's JSONResponse does."""
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+_ROOT_BODY = _json_body({"message": "🏦 Banking Fraud Detection API is running!", "status": "online"})
+_HEALTH_BODY = _json_body({"status": "healthy", "service": "fraud-detection-api", "version": "1.0.0"})
+
+
 # Create minimal FastAPI app
 app = FastAPI(
     title="Banking Fraud Detection API - Minimal", 
@@ -17,21 +55,22 @@ app = FastAPI(
 )
 
 # CORS for GitHub Pages integration
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["https://zey1r.github.io", "*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+if _CORS_ORIGINS:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=_CORS_ORIGINS,
+        allow_credentials=False,
+        allow_methods=("GET", "POST"),
+        allow_headers=("content-type", "authorization"),
+    )
 
 @app.get("/")
 async def root():
-    return {"message": "🏦 Banking Fraud Detection API is running!", "status": "online"}
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy", "service": "fraud-detection-api", "version": "1.0.0"}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 @app.post("/fraud-detection/analyze")
 async def analyze_fraud_minimal(data: dict):
@@ -47,21 +86,17 @@ async def analyze_fraud_minimal(data: dict):
     risk_score = 0.1  # Base risk
     
     # Amount-based risk
-    if amount > 10000:
-        risk_score += 0.3
-    if amount > 50000:
-        risk_score += 0.2
-    if amount > 100000:
-        risk_score += 0.2
+    for threshold, weight in _AMOUNT_RISK_STEPS:
+        if not amount > threshold:
+            break
+        risk_score += weight
     
     # Location-based risk
-    high_risk_locations = ["dubai", "nigeria", "russia"]
-    if any(loc in location for loc in high_risk_locations):
+    if _HIGH_RISK_LOCATIONS.search(location):
         risk_score += 0.25
     
     # Category-based risk
-    high_risk_categories = ["casino", "gambling", "crypto"]
-    if any(cat in merchant_category for cat in high_risk_categories):
+    if _HIGH_RISK_CATEGORIES.search(merchant_category):
         risk_score += 0.3
     
     # Currency risk
@@ -74,8 +109,8 @@ async def analyze_fraud_minimal(data: dict):
     return {
         "transaction_id": data.get("transaction_id", "UNKNOWN"),
         "risk_score": round(risk_score, 3),
-        "risk_level": "HIGH" if risk_score > 0.7 else "MEDIUM" if risk_score > 0.4 else "LOW",
-        "is_fraud": risk_score > 0.7,
+        "risk_level": _risk_level(risk_score),
+        "is_fraud": risk_score > _FRAUD_THRESHOLD,
         "confidence": 0.85,
         "message": f"Risk analysis completed - {risk_score*100:.1f}% risk detected"
     }